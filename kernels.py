@@ -0,0 +1,142 @@
+"""
+Docstring for kernels: physics kernels on plain float arrays, shared by the geometry and simulator.
+Compiled with numba when it is installed, otherwise they run as ordinary NumPy code.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernels are plain NumPy without it
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+def step_schedule(duration: float, dt: float) -> np.ndarray:
+    """
+    Step sizes covering duration: full dt steps, then one shorter step for any remainder.
+    A remainder at float-noise level (n * dt rounding just short of duration) is dropped
+    instead of becoming a ~1e-16 step, unless it is the only step (duration far below dt).
+    """
+    n_full = int(duration // dt)
+    remainder = duration - n_full * dt
+    if remainder > 1e-9 * dt or n_full == 0:
+        return np.append(np.full(n_full, dt), remainder)
+    return np.full(n_full, dt)
+
+
+@njit(cache=True, fastmath=True)
+def step_actors_jit(pos: np.ndarray, vel: np.ndarray, dt: float) -> np.ndarray:
+    """Constant velocity step for (n, 2) position/velocity arrays."""
+    return pos + vel * dt
+
+
+# rows from which integrate hands off to the threaded kernel; below it thread start-up costs more than it saves
+PARALLEL_MIN_ROWS = 100_000
+
+
+@njit(cache=True, parallel=True)
+def _integrate_parallel(pos: np.ndarray, vel: np.ndarray, dt: float) -> None:
+    """pos += vel * dt as one fused loop split across threads (a plain NumPy pass without numba)."""
+    pos += vel * dt
+
+
+def integrate(pos: np.ndarray, vel: np.ndarray, dt: float) -> None:
+    """
+    In-place constant velocity step, pos += vel * dt, for (n, 2) arrays.
+    Plain NumPy for ordinary scenes; only very large arrays go to the threaded kernel.
+    No fastmath, so results are bit-identical to Actor.step's scalar arithmetic.
+    """
+    if pos.shape[0] >= PARALLEL_MIN_ROWS:
+        _integrate_parallel(pos, vel, dt)
+    else:
+        pos += vel * dt
+
+
+@njit(cache=True, fastmath=True)
+def step_turn_jit(times: np.ndarray, pts: np.ndarray, seg_vel: np.ndarray, t: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Position and velocity at relative time t >= 0 along a piecewise-linear path.
+
+    Args:
+        times: (m,) waypoint times, increasing
+        pts: (m, 2) waypoint positions
+        seg_vel: (m-1, 2) constant velocity of each segment
+        t: Time since the path was started
+
+    Returns:
+        (position, velocity) as length-2 arrays; past the last waypoint the final segment is extrapolated
+    """
+    last = times.shape[0] - 1
+    if t <= times[0]:
+        pos = pts[0].copy()
+    else:
+        i = min(np.searchsorted(times, t), last)
+        alpha = (t - times[i - 1]) / (times[i] - times[i - 1])
+        pos = pts[i - 1] + alpha * (pts[i] - pts[i - 1])
+
+    seg = min(np.searchsorted(times, t, side="right") - 1, last - 1)
+    return pos, seg_vel[seg].copy()
+
+
+@njit(cache=True, fastmath=True)
+def simulate_jit(pos: np.ndarray, vel: np.ndarray, turning: bool, t0: float, turn_started: bool,
+                 turn_start: float, schedule: np.ndarray, times: np.ndarray, pts: np.ndarray,
+                 seg_vel: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run a whole rollout with the ego in row 0 holding one action, same update rule as step_world.
+
+    Args:
+        pos, vel: (n, 2) initial positions/velocities, ego first
+        turning: True for TURN (ego follows the turn path), False for WAIT (ego holds still)
+        t0: World time of the initial state
+        turn_started: Whether the ego was already turning in the initial state
+        turn_start: World time the turn started (ignored unless turn_started)
+        schedule: (T,) size of each step, see step_schedule
+        times, pts, seg_vel: Turn path arrays (see step_turn_jit)
+
+    Returns:
+        positions (T, n, 2), ego velocities (T, 2) and world times (T,) after each of the T steps
+    """
+    n_steps = schedule.shape[0]
+    n = pos.shape[0]
+    pos_hist = np.empty((n_steps, n, 2))
+    ego_vel_hist = np.empty((n_steps, 2))
+    time_hist = np.empty(n_steps)
+
+    cur_pos = pos.copy()
+    ego_vel = vel[0].copy()
+    time = t0
+    for k in range(n_steps):
+        time_step = schedule[k]
+        new_pos = step_actors_jit(cur_pos, vel, time_step)
+        if turning:
+            if not turn_started:
+                turn_started = True
+                turn_start = time
+            new_pos[0], ego_vel = step_turn_jit(times, pts, seg_vel, time - turn_start)
+        else:
+            new_pos[0] = cur_pos[0]
+            ego_vel = np.zeros(2)
+
+        time += time_step
+        cur_pos = new_pos
+        pos_hist[k] = cur_pos
+        ego_vel_hist[k] = ego_vel
+        time_hist[k] = time
+
+    return pos_hist, ego_vel_hist, time_hist
+
+
+__all__ = [
+    "step_schedule",
+    "step_actors_jit",
+    "PARALLEL_MIN_ROWS",
+    "integrate",
+    "step_turn_jit",
+    "simulate_jit"
+]
@@ -9,6 +9,16 @@ from __future__ import annotations
 from world_state import *
 from world_geometry import *
 import math
+from collections import defaultdict
+from dataclasses import replace
+from functools import lru_cache
+from itertools import chain, combinations
+from typing import Literal
+
+import numpy as np
+
+from kernels import simulate_jit, step_schedule
+from world_state import _bounds
 
 
 # --------------------------------
@@ -35,16 +45,92 @@ def has_collide(a: Actor, b: Actor) -> bool:
 
     return a_box.overlappingRectangles(b_box)
 
+@lru_cache(maxsize=None)
+def _pair_indices(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Row/column indices of every unordered actor pair (i < j), in scan order."""
+    return np.triu_indices(n, k=1)
+
+# neighbour cells each grid cell pairs with; the other half is covered from the neighbour's side
+_FORWARD_CELLS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+# up to this many actors check_collisons tests pairs with has_collide, below NumPy's per-call overhead
+SCALAR_PAIR_LIMIT = 4
+
+# above this many actors check_collisons uses the hash grid instead of testing every pair
+DENSE_PAIR_LIMIT = 64
+
+def _grid_candidate_pairs(positions: np.ndarray, dims: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hash-grid broad phase: bin actor centers into cells as large as the largest actor dimension,
+    so any two overlapping boxes sit in the same or adjacent cells. Returns candidate (i, j) pairs,
+    i < j, in scan order.
+    """
+    cell_size = float(dims.max())
+    grid: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+    for idx, cell in enumerate(np.floor(positions / cell_size).astype(int).tolist()):
+        grid[tuple(cell)].append(idx)
+
+    pairs = []
+    for (cx, cy), members in grid.items():
+        # pairs inside the cell
+        pairs.extend(combinations(members, 2))
+        # pairs with the forward neighbours
+        for dx, dy in _FORWARD_CELLS:
+            neighbours = grid.get((cx + dx, cy + dy))
+            if neighbours:
+                pairs.extend((a, b) for a in members for b in neighbours)
+
+    if not pairs:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    pairs = np.sort(np.array(pairs, dtype=np.intp), axis=1)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    return pairs[:, 0], pairs[:, 1]
+
+def _overlap_mask(bounds: np.ndarray, i_idx: np.ndarray, j_idx: np.ndarray) -> np.ndarray:
+    """
+    AABB overlap for each pair (i_idx[k], j_idx[k]), following Rect.overlappingRectangles.
+    bounds has shape (n, 4) as (x_min, x_max, y_min, y_max).
+    """
+    a, b = bounds[i_idx], bounds[j_idx]
+    return (
+        (a[:, 0] <= b[:, 1]) & (a[:, 1] >= b[:, 0]) &
+        (a[:, 2] <= b[:, 3]) & (a[:, 3] >= b[:, 2])
+    )
+
 def check_collisons(state: WorldState) -> list[tuple[Actor, Actor]]:
-    """ O(n^2) checking all pairs"""
-    collisions = []
-    for i, actor_a in enumerate(state.actors):
-        for actor_b in state.actors[i+1:]:
-            if has_collide(actor_a, actor_b):
-                collisions.append((actor_a,actor_b))
-    return collisions
+    """
+    AABB test over candidate pairs (i < j).
+    Tiny scenes loop over pairs with has_collide; bigger ones test every pair at once with NumPy,
+    and large ones first narrow the pairs with a hash grid.
+    Same overlap rule as Rect.overlappingRectangles, evaluated with NumPy instead of per pair.
+    Results are memoized on the state instance, so repeat calls on one state (e.g. one per rendered frame) are free.
+    """
+    # memoized on the instance, never by equality, so the returned Actors are always this state's own objects
+    return list(state._memoized(_collisions_of))
+
+
+def _collisions_of(state: WorldState) -> tuple[tuple[Actor, Actor], ...]:
+    """check_collisons body, uncached."""
+    actors = state.actors
+    if len(actors) <= SCALAR_PAIR_LIMIT:
+        return tuple([pair for pair in combinations(actors, 2) if has_collide(*pair)])
+    i_idx, j_idx = _overlapping_pairs(state._aabb, state._pos, state._dims)
+    return tuple([(actors[i], actors[j]) for i, j in zip(i_idx.tolist(), j_idx.tolist())])
+
+
+def _overlapping_pairs(bounds: np.ndarray, positions: np.ndarray, dims: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Overlapping (i, j) rows, i < j, of one (n, 4) set of boxes: every pair for small scenes,
+    hash-grid candidates above DENSE_PAIR_LIMIT.
+    """
+    if len(bounds) <= DENSE_PAIR_LIMIT:
+        i_idx, j_idx = _pair_indices(len(bounds))
+    else:
+        i_idx, j_idx = _grid_candidate_pairs(positions, dims)
+    overlap = _overlap_mask(bounds, i_idx, j_idx)
+    return i_idx[overlap], j_idx[overlap]
 
-    
 
 # --------------------------------
 # STEPPING THROUGH THE WORLD
@@ -69,11 +155,12 @@ def step_world(state: WorldState, ego_action: Action, dt: float) -> WorldState:
     if dt <= 0:
         raise ValueError(f"Time step dt must be positive, got {dt}")
 
-    ego = state.ego
+    ego_idx = state._ego_index
+    ego = state.actors[ego_idx]
     new_ego_turn_start_time = state.ego_turn_start_time
 
     # Update ego based on action
-    if ego_action == Action.TURN:
+    if ego_action is Action.TURN:
         # If this is the first TURN step, record when it started
         if state.ego_turn_start_time is None:
             new_ego_turn_start_time = state.time
@@ -82,8 +169,8 @@ def step_world(state: WorldState, ego_action: Action, dt: float) -> WorldState:
             relative_t = state.time - state.ego_turn_start_time
 
         # Get position and velocity from turn path
-        new_position = state.geometry.get_turn_position_at_time(relative_t)
-        new_velocity = state.geometry.get_turn_velocity_at_time(relative_t, dt)
+        new_position = SCENE.get_turn_position_at_time(relative_t)
+        new_velocity = SCENE.get_turn_velocity_at_time(relative_t)
 
         updated_ego = Actor(
             position=new_position,
@@ -92,7 +179,7 @@ def step_world(state: WorldState, ego_action: Action, dt: float) -> WorldState:
             actor_type=ego.actor_type
         )
 
-    elif ego_action == Action.WAIT:
+    elif ego_action is Action.WAIT:
         # Ego remains stationary (velocity = 0)
         updated_ego = Actor(
             position=ego.position,
@@ -105,7 +192,7 @@ def step_world(state: WorldState, ego_action: Action, dt: float) -> WorldState:
 
         # Ignoring Abstain for Now as it is not required for phase 1
         """
-        elif ego_action == Action.ABSTAIN:
+        elif ego_action is Action.ABSTAIN:
         # Abstain means "refuse to act" - ego stays frozen
         updated_ego = Actor(
             position=ego.position,
@@ -119,36 +206,57 @@ def step_world(state: WorldState, ego_action: Action, dt: float) -> WorldState:
     else:
         raise ValueError(f"Unknown action: {ego_action}")
 
-    # Step all other actors forward using constant velocity kinematics
-    updated_others = [actor.step(dt) for actor in state.actors if actor != ego]
+    # Step all other actors forward using constant velocity kinematics,
+    # as a single array update instead of one Actor.step per actor
+    order = [ego_idx] + [i for i in range(len(state.actors)) if i != ego_idx]
+    new_pos = state._pos[order]
+    new_vel = state._vel[order]
+    new_pos[1:] += new_vel[1:] * dt
+    new_pos[0] = updated_ego.position
+    new_vel[0] = updated_ego.velocity
+    updated_others = [state.actors[i]._at(x, y) for i, (x, y) in zip(order[1:], new_pos[1:].tolist())]
 
     # Build new actor tuple (functional update)
     new_actors = tuple([updated_ego] + updated_others)
 
-    # Return a new WorldState
-    return WorldState(
-        geometry=state.geometry,
+    # Return a new WorldState, keeping the stepped arrays so the next step doesn't rebuild them from the Actors
+    new_state = WorldState(
         time=state.time + dt,
         ego_turn_start_time=new_ego_turn_start_time,
         actors=new_actors
     )
+    new_state._seed_caches(pos=new_pos, vel=new_vel, dims=state._dims[order])
+    return new_state
 
 # ---------------------
 # TRAJECTORY SIMULATION
 # ---------------------
-def simulate_trajectory(initial_state: WorldState, ego_action: Action, duration: float, dt: float=0.1) -> list[WorldState]:
+def simulate_trajectory(
+    initial_state: WorldState,
+    ego_action: Action,
+    duration: float,
+    dt: float=0.1,
+    record: Literal["all", "endpoints", "collisions"] = "all"
+) -> list[WorldState] | tuple[WorldState, float | None]:
     """Simulate a full trajectory for a given ego action.
 
-    Repeatedly calls step_world() to generate a sequence of states.
+    Follows the same update rule as repeated step_world() calls, but runs the
+    whole loop on arrays in simulate_jit and only builds WorldStates for the results.
 
     Args:
         initial_state: Starting world state
         ego_action: Action for ego to take (held constant throughout)
         duration: Total simulation time in seconds (must be positive)
         dt: Time step for each iteration (must be positive, default 0.1s)
+        record: Which snapshots to build:
+            "all" - every timestep
+            "endpoints" - only the initial and final state, advanced in one step instead of T
+            "collisions" - only the final state, plus the first time any two actors overlap
 
     Returns:
-        List of WorldState snapshots at each timestep, including initial_state
+        "all": List of WorldState snapshots at each timestep, including initial_state
+        "endpoints": [initial_state, final_state]
+        "collisions": (final_state, time of the first snapshot with a collision, or None)
 
     Raises:
         ValueError: If duration <= 0 or dt <= 0
@@ -157,20 +265,80 @@ def simulate_trajectory(initial_state: WorldState, ego_action: Action, duration:
         raise ValueError(f"Duration must be positive, got {duration}")
     if dt <= 0:
         raise ValueError(f"Time step dt must be positive, got {dt}")
+    if record not in ("all", "endpoints", "collisions"):
+        raise ValueError(f"Unknown record mode: {record}")
 
-    states = [initial_state]
-    current_state = initial_state
-    elapsed = 0.0
+    if ego_action is Action.TURN:
+        turning = True
+    elif ego_action is Action.WAIT:
+        turning = False
+    else:
+        raise ValueError(f"Unknown action: {ego_action}")
+
+    # convert to arrays once (ego first, same order step_world produces)
+    rollout = RolloutState.from_world_state(initial_state)
+    turn_started = initial_state.ego_turn_start_time is not None
+    schedule = step_schedule(duration, dt)
 
-    # Simulate until we've covered the full duration
-    while elapsed < duration:
-        # Don't overshoot the duration
-        time_step = min(dt, duration - elapsed)
-        current_state = step_world(current_state, ego_action, time_step)
-        states.append(current_state)
-        elapsed += time_step
+    # TURN keeps (or starts) the turn clock at the initial time, WAIT clears it
+    if turning:
+        ego_turn_start_time = initial_state.ego_turn_start_time if turn_started else initial_state.time
+    else:
+        ego_turn_start_time = None
+
+    # convert back to WorldStates only for the snapshots asked for
+    def snapshot(pos_arr: np.ndarray, ego_vel: np.ndarray, time: float) -> WorldState:
+        vel_arr = rollout.vel_arr.copy()
+        vel_arr[0] = ego_vel
+        return replace(
+            rollout,
+            pos_arr=pos_arr,
+            vel_arr=vel_arr,
+            time=time,
+            ego_turn_start_time=ego_turn_start_time
+        ).to_world_state()
+
+    if record == "endpoints":
+        # velocities are constant, so Euler is exact and the others need one multiply-add over the whole
+        # duration; the ego ends where its last step puts it (the turn path sampled at that step's start)
+        total = float(schedule.sum())
+        pos_arr = rollout.pos_arr + rollout.vel_arr * total
+        if turning:
+            last_step_start = initial_state.time + float(schedule[:-1].sum())
+            pos_arr[0] = SCENE.get_turn_position_at_time(last_step_start - ego_turn_start_time)
+            ego_vel = SCENE.get_turn_velocity_at_time(last_step_start - ego_turn_start_time)
+        else:
+            pos_arr[0] = rollout.pos_arr[0]
+            ego_vel = (0.0, 0.0)
+        return [initial_state, snapshot(pos_arr, ego_vel, initial_state.time + total)]
+
+    # run the whole loop in the kernel
+    pos_hist, ego_vel_hist, time_hist = simulate_jit(
+        rollout.pos_arr,
+        rollout.vel_arr,
+        turning,
+        initial_state.time,
+        turn_started,
+        initial_state.ego_turn_start_time if turn_started else 0.0,
+        schedule,
+        SCENE._turn_times,
+        SCENE._turn_pts,
+        SCENE._segment_vel
+    )
 
-    return states
+    if record == "collisions":
+        # test the initial state, then each step in order, with the same dense-or-grid pairing as
+        # check_collisons; stop at the first step with any overlap
+        dims = rollout.template._dims
+        half = dims / 2
+        first_collision_time = None
+        for k, positions in enumerate(chain([rollout.pos_arr], pos_hist)):
+            if len(_overlapping_pairs(_bounds(positions, half), positions, dims)[0]):
+                first_collision_time = initial_state.time if k == 0 else float(time_hist[k - 1])
+                break
+        return snapshot(pos_hist[-1], ego_vel_hist[-1], float(time_hist[-1])), first_collision_time
+
+    return [initial_state] + [snapshot(pos_hist[k], ego_vel_hist[k], float(time_hist[k])) for k in range(len(time_hist))]
 
 # ---------------------
 # OUTCOME EVALUATION
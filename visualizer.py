@@ -8,6 +8,9 @@ Displays:
 - Real-time simulation playback
 """
 
+import gc
+import os
+import numpy as np
 import pygame
 import sys
 from typing import Optional
@@ -24,6 +27,17 @@ RED = (244, 67, 54)
 ORANGE = (255, 152, 0)
 BLACK = (0, 0, 0)
 YELLOW = (255, 235, 59)
+BLUE = (33, 150, 243)
+
+# Vehicle sprites are rotated in steps of this many degrees
+SPRITE_ANGLE_STEP = 5
+
+# Body color per actor type (wheels are always BLACK)
+BODY_COLOR_BY_TYPE = {
+    ActorType.EGO: RED,
+    ActorType.VEHICLE: ORANGE,
+    ActorType.PEDESTRIAN: BLUE,
+}
 
 
 class Visualizer:
@@ -37,14 +51,25 @@ class Visualizer:
             height: Window height in pixels
             scale: Pixels per meter (controls zoom level)
         """
+        # let SDL batch render calls (must be set before pygame.init)
+        os.environ.setdefault("SDL_RENDER_BATCHING", "1")
         pygame.init()
         self.width = width
         self.height = height
         self.scale = scale
         self.screen = pygame.display.set_mode((width, height))
+        # world -> screen affine transform (y flipped), for converting many positions at once
+        self._w2s_scale = np.array([scale, -scale])
+        self._w2s_offset = np.array([width / 2, height / 2])
         pygame.display.set_caption("Occluded Left Turn Simulator")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 24)
+        # (surface, topleft) pairs drawn in one Surface.blits call at the end of draw_state
+        self._blit_queue: list[tuple[pygame.Surface, tuple[int, int]]] = []
+        # rotated vehicle sprites keyed by (actor_type, width_px, length_px, angle_bin), built on first use
+        self._vehicle_sprites: dict[tuple[ActorType, int, int, int], pygame.Surface] = {}
+        # static grass + road (+ turn path) layers keyed by show_turn_path, rendered on first use
+        self._bg_layers: dict[bool, pygame.Surface] = {}
 
     def world_to_screen(self, pos: Vector) -> tuple[int, int]:
         """Convert world coordinates (meters) to screen coordinates (pixels).
@@ -56,6 +81,10 @@ class Visualizer:
         screen_y = int(self.height / 2 - pos.y * self.scale)
         return (screen_x, screen_y)
 
+    def world_to_screen_batch(self, positions: np.ndarray) -> np.ndarray:
+        """Vectorized world_to_screen for an (n, 2) array of positions, returns (n, 2) int32 pixels."""
+        return (self._w2s_offset + positions * self._w2s_scale).astype(np.int32)
+
     def draw_background(self):
         """Fill screen with grass color."""
         self.screen.fill(GRASS_GREEN)
@@ -103,15 +132,25 @@ class Visualizer:
         """Draw a dashed horizontal line."""
         if line.b != 0:
             y_world = -line.c / line.b
-            y_screen = self.world_to_screen(Vector(0, y_world))[1]
 
-            # Draw dashes across screen width
+            # Collect dash endpoints across screen width, then draw them together
+            dashes = []
             x_world = -10
             while x_world < 10:
                 start_screen = self.world_to_screen(Vector(x_world, y_world))
                 end_screen = self.world_to_screen(Vector(x_world + dash_length, y_world))
-                pygame.draw.line(self.screen, color, start_screen, end_screen, 2)
+                dashes.append((start_screen, end_screen))
                 x_world += dash_length + gap_length
+            self._draw_segments(color, dashes, 2)
+
+    def _draw_segments(self, color, segments, thickness):
+        """
+        Draw disjoint (start, end) line segments in one color.
+        pygame.draw.lines would join consecutive points, so dashes with gaps still need one line each.
+        """
+        draw_line, screen = pygame.draw.line, self.screen
+        for start, end in segments:
+            draw_line(screen, color, start, end, thickness)
 
     def draw_turn_path(self, geometry: SceneGeometry, color=WHITE, show_waypoints=True):
         """Draw the planned turn path as a dashed arc."""
@@ -138,40 +177,53 @@ class Visualizer:
         dx = (end[0] - start[0]) / segments
         dy = (end[1] - start[1]) / segments
 
-        for i in range(segments):
-            if i % 2 == 0:
-                seg_start = (start[0] + i * dx, start[1] + i * dy)
-                seg_end = (start[0] + (i + 1) * dx, start[1] + (i + 1) * dy)
-                pygame.draw.line(self.screen, color1, seg_start, seg_end, 2)
+        # every other sub-segment is drawn, all in color1
+        dashes = [
+            ((start[0] + i * dx, start[1] + i * dy), (start[0] + (i + 1) * dx, start[1] + (i + 1) * dy))
+            for i in range(0, segments, 2)
+        ]
+        self._draw_segments(color1, dashes, 2)
 
-    def draw_actor(self, actor: Actor):
-        """Draw a vehicle as a rotated rectangle with wheels."""
-        # Determine color based on actor type
-        if actor.actor_type == ActorType.EGO:
-            body_color = RED
-            wheel_color = BLACK
-        elif actor.actor_type == ActorType.VEHICLE:
-            body_color = ORANGE
-            wheel_color = BLACK
-        else:  # PEDESTRIAN
-            body_color = (33, 150, 243)  # Blue
-            wheel_color = BLACK
+    def draw_actor(self, actor: Actor, center: Optional[tuple[int, int]] = None):
+        """Draw a vehicle as a rotated rectangle with wheels.
 
+        Args:
+            actor: Actor to draw
+            center: Precomputed screen position of the actor, computed from actor.position if None
+        """
         # Get screen position
-        center = self.world_to_screen(actor.position)
+        if center is None:
+            center = self.world_to_screen(actor.position)
 
-        # Calculate rotation angle from velocity
-        if actor.velocity.x != 0 or actor.velocity.y != 0:
-            import math
-            angle = math.atan2(actor.velocity.y, actor.velocity.x)
-            angle_deg = math.degrees(angle) - 90  # -90 because 0° should point up
+        # Rotation angle from the actor's cached heading (stationary actors point up)
+        if actor.heading_deg is not None:
+            angle_deg = actor.heading_deg - 90  # -90 because 0° should point up
         else:
             angle_deg = 0
 
-        # Create vehicle surface (width x length in pixels)
+        # Vehicle size in pixels (width x length)
         width_px = int(actor.dims[0] * self.scale)
         length_px = int(actor.dims[1] * self.scale)
 
+        # Look up (or build once) the sprite rotated to the nearest angle bin
+        angle_bin = round(angle_deg / SPRITE_ANGLE_STEP) % (360 // SPRITE_ANGLE_STEP)
+        key = (actor.actor_type, width_px, length_px, angle_bin)
+        rotated = self._vehicle_sprites.get(key)
+        if rotated is None:
+            rotated = self._build_vehicle_sprite(actor.actor_type, width_px, length_px, angle_bin * SPRITE_ANGLE_STEP)
+            self._vehicle_sprites[key] = rotated
+
+        # Queue the blit (flushed by draw_state)
+        rotated_rect = rotated.get_rect(center=center)
+        self._blit_queue.append((rotated, rotated_rect.topleft))
+
+    def _build_vehicle_sprite(self, actor_type: ActorType, width_px: int, length_px: int,
+                              angle_deg: float) -> pygame.Surface:
+        """Render a vehicle body with wheels and rotate it by angle_deg."""
+        # Determine color based on actor type
+        body_color = BODY_COLOR_BY_TYPE[actor_type]
+        wheel_color = BLACK
+
         # Draw vehicle body
         vehicle_surface = pygame.Surface((width_px, length_px), pygame.SRCALPHA)
         pygame.draw.rect(vehicle_surface, body_color, (0, 0, width_px, length_px), border_radius=4)
@@ -189,47 +241,69 @@ class Visualizer:
         pygame.draw.circle(vehicle_surface, wheel_color, (wheel_inset_x, length_px - wheel_inset_y), wheel_radius)
         pygame.draw.circle(vehicle_surface, wheel_color, (width_px - wheel_inset_x, length_px - wheel_inset_y), wheel_radius)
 
-        # Rotate and blit
-        rotated = pygame.transform.rotate(vehicle_surface, angle_deg)
-        rotated_rect = rotated.get_rect(center=center)
-        self.screen.blit(rotated, rotated_rect.topleft)
+        return pygame.transform.rotate(vehicle_surface, angle_deg)
+
+    def _render_static_layer(self, geometry: SceneGeometry, show_turn_path: bool) -> pygame.Surface:
+        """Render background, road geometry and optionally the turn path once into an off-screen surface."""
+        layer = pygame.Surface((self.width, self.height)).convert()
+        # the draw_* helpers target self.screen, so point it at the layer while rendering
+        screen, self.screen = self.screen, layer
+        try:
+            self.draw_background()
+            self.draw_geometry(geometry)
+            if show_turn_path:
+                self.draw_turn_path(geometry)
+        finally:
+            self.screen = screen
+        return layer
 
     def draw_state(self, state: WorldState, show_turn_path: bool = True):
         """Draw complete world state."""
-        self.draw_background()
-        self.draw_geometry(state.geometry)
+        # The scene geometry and turn path never change, so reuse the pre-rendered background
+        bg = self._bg_layers.get(show_turn_path)
+        if bg is None:
+            bg = self._bg_layers[show_turn_path] = self._render_static_layer(state.geometry, show_turn_path)
+        self.screen.blit(bg, (0, 0))
 
-        if show_turn_path:
-            self.draw_turn_path(state.geometry)
-
-        # Draw all actors
-        for actor in state.actors:
-            self.draw_actor(actor)
+        # Draw all actors, converting every position to screen space in one pass
+        screen_xy = self.world_to_screen_batch(state._pos).tolist()
+        for actor, center in zip(state.actors, screen_xy):
+            self.draw_actor(actor, center)
 
         # Draw HUD
         self._draw_hud(state)
 
+        # Draw every queued actor/HUD surface in a single call
+        self._flush_blits()
+
+    def _flush_blits(self):
+        """Blit all queued surfaces at once and clear the queue."""
+        self.screen.blits(self._blit_queue, doreturn=0)
+        self._blit_queue.clear()
+
     def _draw_hud(self, state: WorldState):
         """Draw heads-up display with state info."""
         # Time
         time_text = self.font.render(f"Time: {state.time:.1f}s", True, BLACK)
-        self.screen.blit(time_text, (10, 10))
+        self._blit_queue.append((time_text, (10, 10)))
+
+        classes = state.classify()
 
         # Ego velocity
-        ego_speed = (state.ego.velocity.x**2 + state.ego.velocity.y**2)**0.5
+        ego_speed = (classes.ego.velocity.x**2 + classes.ego.velocity.y**2)**0.5
         speed_text = self.font.render(f"Ego Speed: {ego_speed:.1f} m/s", True, BLACK)
-        self.screen.blit(speed_text, (10, 40))
+        self._blit_queue.append((speed_text, (10, 40)))
 
         # Number of vehicles
-        num_vehicles = sum(1 for a in state.actors if a.actor_type == ActorType.VEHICLE)
+        num_vehicles = len(classes.vehicles)
         vehicles_text = self.font.render(f"Vehicles: {num_vehicles}", True, BLACK)
-        self.screen.blit(vehicles_text, (10, 70))
+        self._blit_queue.append((vehicles_text, (10, 70)))
 
         # Check collisions
         collisions = check_collisons(state)
         if collisions:
             collision_text = self.font.render("COLLISION!", True, RED)
-            self.screen.blit(collision_text, (self.width // 2 - 50, 10))
+            self._blit_queue.append((collision_text, (self.width // 2 - 50, 10)))
 
     def animate_trajectory(self, states: list[WorldState], fps: int = 30,
                           realtime_speed: float = 1.0):
@@ -319,9 +393,6 @@ def demo_visualization():
     """Demo: visualize a simple turn scenario."""
     from world_state import WorldState, Actor, ActorType, Action
 
-    # Create scene
-    geometry = SceneGeometry()
-
     # Ego at stop line (approaching from south, wanting to turn left/west)
     ego = Actor(
         position=Vector(0, 1),
@@ -340,7 +411,6 @@ def demo_visualization():
     )
 
     initial_state = WorldState(
-        geometry=geometry,
         time=0.0,
         ego_turn_start_time=None,
         actors=(ego, oncoming)
@@ -348,6 +418,9 @@ def demo_visualization():
 
     # Simulate ego turning
     states = simulate_trajectory(initial_state, Action.TURN, duration=4.0, dt=0.1)
+    # the trajectory is immutable from here on; move it out of the collector's reach so
+    # GC passes during playback don't rescan every state and actor
+    gc.freeze()
 
     # Visualize
     viz = Visualizer(scale=50)
@@ -4,12 +4,39 @@ Docstring for world_geometry: Defining shapes required for the world, as well as
 from __future__ import annotations
 import math
 from dataclasses import dataclass
+from typing import NamedTuple
 
-@dataclass(frozen=True)
-class Vector:
+import numpy as np
+
+from kernels import step_turn_jit
+
+class Vector(NamedTuple):
+    """Immutable 2D point/vector; a tuple, so it unpacks and converts straight to NumPy/Pygame."""
     x: float
     y: float
 
+    # real vector arithmetic instead of tuple concatenation/repetition; anything else is a TypeError
+    def __add__(self, other: Vector) -> Vector:
+        if not isinstance(other, Vector):
+            return NotImplemented
+        return Vector(self.x + other.x, self.y + other.y)
+
+    def __radd__(self, other: object) -> Vector:
+        # raise instead of returning NotImplemented, which would fall back to tuple concatenation
+        raise TypeError(f"unsupported operand type(s) for +: '{type(other).__name__}' and 'Vector'")
+
+    def __sub__(self, other: Vector) -> Vector:
+        if not isinstance(other, Vector):
+            return NotImplemented
+        return Vector(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, k: float) -> Vector:
+        if not isinstance(k, (int, float)):
+            return NotImplemented
+        return Vector(self.x * k, self.y * k)
+
+    __rmul__ = __mul__
+
 @dataclass(frozen=True)
 class Rect:
     x_min: float
@@ -51,7 +78,18 @@ class SceneGeometry():
     """
     Concrete geometry for a specific occluded left-turn scenario.
     Hardcoded coordinates define this exact intersection layout.
+    Everything is a class-level constant, so there is a single shared instance (SCENE).
     """
+    _instance = None
+
+    def __new__(cls):
+        """Always return the shared instance of cls (looked up on cls itself, so subclasses get their own)."""
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
     # ---------
     # LINES
     # ---------
@@ -70,25 +108,34 @@ class SceneGeometry():
     far_cross_near = Rect(x_min=-4, x_max=-3, y_min=2,y_max=3)
     far_cross_far = Rect(x_min=-4, x_max=-3, y_min=3,y_max=6)
     
-    def turn_path(self) -> list[tuple[float, Vector]]:
+    # ---------
+    # TURN PATH
+    # ---------
+    # waypoint times (s since TURN decision) and positions, stored once as arrays
+    _turn_times = np.array([0.0, 0.3, 0.5, 1.5, 2.0, 2.5])
+    _turn_pts = np.array([
+        # needs to start moving at stop line
+        [0, 1],
+        [0, 2],
+        [0, 3],
+        [-0.5, 4.5],
+        [-1, 5],
+        [-2, 5]
+    ], dtype=np.float64)
+    # constant velocity along each waypoint segment; the last row also covers extrapolation
+    _segment_vel = np.diff(_turn_pts, axis=0) / np.diff(_turn_times)[:, None]
+
+    def turn_path(self) -> tuple[tuple[float, Vector], ...]:
         """
         Hard-coded trajectory for left turn from the stop line.
-        Returns list of (time, position) tuples defining the ego path.
+        Returns (time, position) tuples defining the ego path.
 
         **SHOULD ONLY BE INITIATED IF CAR IS @ STOP LINE, AND HAS MADE APPROPRIATE STOP**
 
         Mix of straight and parabolic arc from stop line through intersection to far road.
         Go straight (Points 1-3), make parabolic turn after passing center line (Points 4-6).
         """
-        return [
-            # needs to start moving at stop line
-            (0.0, Vector(0, 1)),      
-            (0.3, Vector(0, 2)),   
-            (0.5, Vector(0, 3)),      
-            (1.5, Vector(-0.5, 4.5)), 
-            (2.0, Vector(-1, 5)),     
-            (2.5, Vector(-2, 5))      
-        ]
+        return _TURN_PATH
 
     def get_turn_position_at_time(self, t: float) -> Vector:
         """
@@ -104,75 +151,52 @@ class SceneGeometry():
         Raises:
             ValueError: If t < 0 (invalid - can't query position before decision)
         """
-        path = self.turn_path()
-
         # time can not be negative
         if t < 0:
             raise ValueError(f"Time t={t} cannot be negative. Turn path starts at t=0.")
 
-        # At or before first waypoint
-        if t <= path[0][0]:
-            return path[0][1]
-
-        # after turn path ends - continue straight at final segment velocity
-        if t >= path[-1][0]:
-            # Compute velocity from last segment
-            t_last = path[-1][0]
-            t_prev = path[-2][0]
-            pos_last = path[-1][1]
-            pos_prev = path[-2][1]
-
-            velocity = Vector(
-                x=(pos_last.x - pos_prev.x) / (t_last - t_prev),
-                y=(pos_last.y - pos_prev.y) / (t_last - t_prev)
-            )
-
-            # extrapolate the position beyond final waypoint
-            dt_extra = t - t_last
-            return Vector(
-                x=pos_last.x + velocity.x * dt_extra,
-                y=pos_last.y + velocity.y * dt_extra
-            )
-
-        # in between waypoints
-        for i in range(len(path) - 1):
-            t0, pos0 = path[i]
-            t1, pos1 = path[i + 1]
-
-            if t0 <= t <= t1:
-                # Linear interpolation
-                alpha = (t - t0) / (t1 - t0)
-                return Vector(
-                    x=pos0.x + alpha * (pos1.x - pos0.x),
-                    y=pos0.y + alpha * (pos1.y - pos0.y)
-                )
-
-        # Shouldn't reach here
-        return path[-1][1]
+        # past the last waypoint the kernel continues straight at final segment velocity
+        pos, _ = step_turn_jit(self._turn_times, self._turn_pts, self._segment_vel, t)
+        x, y = pos.tolist()
+        return Vector(x=x, y=y)
     
-    def get_turn_velocity_at_time(self, t: float, dt: float = 0.01) -> Vector:
+    def get_turn_velocity_at_time(self, t: float) -> Vector:
         """
-        Compute ego velocity at time t along turn path.
-        Uses finite difference approximation: v(t) ≈ (pos(t+dt) - pos(t)) / dt
+        Get ego velocity at time t along the turn path.
+        The path is piecewise linear, so this is the constant velocity of the segment containing t
+        (the final segment's velocity continues past the last waypoint).
 
         Args:
             t: Time elapsed since TURN decision (relative time)
-            dt: Small time step for numerical differentiation
 
         Returns:
             Velocity vector at time t
+
+        Raises:
+            ValueError: If t < 0 (invalid - can't query velocity before decision)
         """
-        pos_now = self.get_turn_position_at_time(t)
-        pos_future = self.get_turn_position_at_time(t + dt)
-        return Vector(
-            x=(pos_future.x - pos_now.x) / dt,
-            y=(pos_future.y - pos_now.y) / dt 
-        )
+        if t < 0:
+            raise ValueError(f"Time t={t} cannot be negative. Turn path starts at t=0.")
+
+        _, vel = step_turn_jit(self._turn_times, self._turn_pts, self._segment_vel, t)
+        vx, vy = vel.tolist()
+        return Vector(x=vx, y=vy)
+
+
+# (time, position) waypoints of SceneGeometry.turn_path, built once
+_TURN_PATH = tuple(
+    (t, Vector(x=x, y=y))
+    for t, (x, y) in zip(SceneGeometry._turn_times.tolist(), SceneGeometry._turn_pts.tolist())
+)
+
+# the one scene every WorldState shares
+SCENE = SceneGeometry()
 
 
 __all__ = [
     "Vector",
     "Rect",
     "Line",
-    "SceneGeometry"
+    "SceneGeometry",
+    "SCENE"
 ]
\ No newline at end of file
@@ -1,23 +1,47 @@
 # this is to allow referring functions to return the class type within the class
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
-from world_geometry import Vector, SceneGeometry
+import math
+from dataclasses import KW_ONLY, dataclass, field, replace
+from enum import IntEnum
+from functools import cached_property
+from typing import Callable, NamedTuple, TypeVar
 
+import numpy as np
+from kernels import integrate
+from world_geometry import Vector, SceneGeometry, SCENE
 
-class Action(Enum):
-    """Ego vehicle decision options."""
-    ABSTAIN = "abstain"
-    TURN = "turn"
-    WAIT = "wait"
 
-class ActorType(Enum):
-    EGO = "ego"
-    VEHICLE = "vehicle"
-    PEDESTRIAN = "pedestrian"
+class Action(IntEnum):
+    """Ego vehicle decision options. Int-valued so comparisons are plain int compares."""
+    ABSTAIN = 0
+    TURN = 1
+    WAIT = 2
 
-@dataclass(frozen=True)
+class ActorType(IntEnum):
+    """Int-valued so comparisons are plain int compares and values can index tables/arrays."""
+    EGO = 0
+    VEHICLE = 1
+    PEDESTRIAN = 2
+
+# one shared tuple per distinct actor size; scenes use a handful of sizes across many actors.
+# Bounded so a stream of arbitrary sizes can't grow it forever: past the limit new sizes aren't interned
+_DIMS_CACHE: dict[tuple[float, float], tuple[float, float]] = {}
+_DIMS_CACHE_LIMIT = 256
+
+
+def _intern_dims(w: float, h: float) -> tuple[float, float]:
+    """Interned (w, h) box dimensions: equal sizes return the same tuple object while the cache has room."""
+    key = (w, h)
+    interned = _DIMS_CACHE.get(key)
+    if interned is not None:
+        return interned
+    if len(_DIMS_CACHE) < _DIMS_CACHE_LIMIT:
+        _DIMS_CACHE[key] = key
+    return key
+
+
+@dataclass(frozen=True, slots=True)
 class Actor:
     """Moving object in the scene: vehicle, pedestrian, etc."""
     position: Vector
@@ -25,25 +49,85 @@ class Actor:
     # box dimension
     dims: tuple[float, float]
     actor_type: ActorType  
+    # heading in degrees (atan2 convention, 0 = +x), None when stationary; derived from velocity
+    heading_deg: float | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Intern dims and cache the heading so renderers don't recompute atan2 every frame."""
+        object.__setattr__(self, "dims", _intern_dims(*self.dims))
+        vx, vy = self.velocity
+        heading = math.degrees(math.atan2(vy, vx)) if vx != 0 or vy != 0 else None
+        object.__setattr__(self, "heading_deg", heading)
 
     def step(self, dt: float) -> Actor:
-        """Return new the new Actor after deterministic physics step."""
-        return Actor(
-            position=Vector(
-                x=self.position.x + self.velocity.x * dt,
-                y=self.position.y + self.velocity.y * dt
-            ),
-            velocity=self.velocity,
-            dims=self.dims,
-            actor_type=self.actor_type
-        )
+        """Return new the new Actor after deterministic physics step (the per-type rule in _STEP_FNS)."""
+        return _STEP_FNS[self.actor_type](self, dt)
+
+    def _at(self, x: float, y: float) -> Actor:
+        """
+        Copy of this actor moved to (x, y). Velocity, dims, type and so heading_deg carry over,
+        so this skips dataclass __init__/__post_init__ and fills the slots directly.
+        """
+        actor = _new_object(Actor)
+        _set_position(actor, _new_tuple(Vector, (x, y)))
+        _set_velocity(actor, self.velocity)
+        _set_dims(actor, self.dims)
+        _set_actor_type(actor, self.actor_type)
+        _set_heading_deg(actor, self.heading_deg)
+        return actor
+
+
+# pre-bound constructors/slot setters for Actor._at; the slot setters bypass the frozen __setattr__
+_new_object = object.__new__
+_new_tuple = tuple.__new__
+_set_position, _set_velocity, _set_dims, _set_actor_type, _set_heading_deg = (
+    Actor.__dict__[name].__set__ for name in ("position", "velocity", "dims", "actor_type", "heading_deg")
+)
+
+
+def _step_constant_velocity(actor: Actor, dt: float) -> Actor:
+    """Explicit Euler step at the actor's own (constant) velocity."""
+    position, velocity = actor.position, actor.velocity
+    return actor._at(position.x + velocity.x * dt, position.y + velocity.y * dt)
+
+
+# physics step per actor type, indexed by ActorType value, so Actor.step dispatches with one lookup
+# instead of branching on the type; every type currently moves at constant velocity
+_STEP_FNS: tuple[Callable[[Actor, float], Actor], ...] = tuple(_step_constant_velocity for _ in ActorType)
+# the array paths (WorldState.step, step_world, RolloutState, simulate_jit) hard-code constant velocity
+# for every row; a per-type rule here must be mirrored there per type partition before relaxing this
+assert all(fn is _step_constant_velocity for fn in _STEP_FNS), "array step paths assume constant velocity"
+
+
+_T = TypeVar("_T")
+
+# signs turning a center and half-extent into the low/high edges of a box
+_LO_HI = np.array([-1.0, 1.0])
+
+
+def _bounds(pos: np.ndarray, half: np.ndarray) -> np.ndarray:
+    """
+    (n, 4) axis-aligned boxes as (x_min, x_max, y_min, y_max) columns from (n, 2) centers and half-extents.
+    Built as (n, axis, lo/hi) in one broadcast expression and flattened.
+    """
+    return (pos[:, :, None] + half[:, :, None] * _LO_HI).reshape(-1, 4)
+
+
+class ActorClasses(NamedTuple):
+    """Actors of one WorldState split by type, see WorldState.classify."""
+    ego: Actor
+    vehicles: tuple[Actor, ...]
+    pedestrians: tuple[Actor, ...]
 
 
 @dataclass(frozen=True)
 class WorldState:
     """Complete state of the world at a given time. Immutable
     """
-    geometry: SceneGeometry
+    # shared scene singleton; kept as a field for callers that read state.geometry
+    geometry: SceneGeometry = SCENE
+    # the rest are keyword-only: geometry now has a default, so positional construction can't be kept
+    _: KW_ONLY
     # global world time
     time: float
     # none if not turning, set to state.time when TURN action first chosen
@@ -52,8 +136,20 @@ class WorldState:
 
     def __post_init__(self):
         """Validate invariants."""
+        # actors is stored as a tuple so states stay hashable; accept any sequence from callers
+        if type(self.actors) is not tuple:
+            object.__setattr__(self, "actors", tuple(self.actors))
+        # partition actors by type in one pass (actor_type is immutable, so this never goes stale);
+        # the int-valued ActorType indexes the bucket table directly instead of an if/elif chain
+        buckets: tuple[list[int], ...] = tuple([] for _ in ActorType)
+        for i, a in enumerate(self.actors):
+            buckets[a.actor_type].append(i)
+        ego_indices = buckets[ActorType.EGO]
+        vehicle_indices = buckets[ActorType.VEHICLE]
+        pedestrian_indices = buckets[ActorType.PEDESTRIAN]
+
         # only one ego can exist
-        ego_count = sum(1 for a in self.actors if a.actor_type == ActorType.EGO)
+        ego_count = len(ego_indices)
         if ego_count == 0:
             raise ValueError("WorldState must contain exactly one ego vehicle (found 0)")
         if ego_count > 1:
@@ -66,25 +162,244 @@ class WorldState:
         if self.time < 0:
             raise ValueError(f"Time must be non-negative, got {self.time}")
 
+        self._set_partitions(ego_indices[0], tuple(vehicle_indices), tuple(pedestrian_indices))
+
+    def _set_partitions(self, ego_index: int, vehicle_indices: tuple[int, ...],
+                        pedestrian_indices: tuple[int, ...]) -> None:
+        """Store the per-type indices and actor tuples (frozen, hence object.__setattr__)."""
+        actors = self.actors
+        for name, value in (("_ego_index", ego_index),
+                            ("_vehicle_indices", vehicle_indices),
+                            ("_pedestrian_indices", pedestrian_indices),
+                            ("_vehicles", tuple([actors[i] for i in vehicle_indices])),
+                            ("_pedestrians", tuple([actors[i] for i in pedestrian_indices]))):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def _unchecked(cls, like: WorldState, time: float, ego_turn_start_time: float | None,
+                   actors: tuple[Actor, ...]) -> WorldState:
+        """
+        Build a WorldState without re-running __post_init__ validation.
+        actors must have the same types and dims, in the same order, as like.actors.
+        """
+        state = object.__new__(cls)
+        for name, value in (("geometry", like.geometry), ("time", time),
+                            ("ego_turn_start_time", ego_turn_start_time), ("actors", actors)):
+            object.__setattr__(state, name, value)
+        state._set_partitions(like._ego_index, like._vehicle_indices, like._pedestrian_indices)
+        return state
+
+    def _seed_caches(self, pos: np.ndarray | None = None, vel: np.ndarray | None = None,
+                     dims: np.ndarray | None = None) -> None:
+        """
+        Pre-fill the _pos/_vel/_dims array caches with arrays the caller already has, (n, 2) in actor order.
+        The arrays are kept, not copied, so they must not be mutated afterwards.
+        """
+        for name, value in (("_pos", pos), ("_vel", vel), ("_dims", dims)):
+            if value is not None:
+                self.__dict__[name] = value
+
+    def _memoized(self, fn: Callable[[WorldState], _T]) -> _T:
+        """fn(self), computed once per state instance (never shared between equal states)."""
+        memo = self.__dict__.setdefault("_memo", {})
+        if fn not in memo:
+            memo[fn] = fn(self)
+        return memo[fn]
+
+    @cached_property
+    def _pos(self) -> np.ndarray:
+        """(n, 2) actor positions, in the same order as actors."""
+        return np.array([a.position for a in self.actors], dtype=float).reshape(-1, 2)
+
+    @cached_property
+    def _vel(self) -> np.ndarray:
+        """(n, 2) actor velocities, in the same order as actors."""
+        return np.array([a.velocity for a in self.actors], dtype=float).reshape(-1, 2)
+
+    @cached_property
+    def _dims(self) -> np.ndarray:
+        """(n, 2) actor box dimensions, in the same order as actors."""
+        return np.array([a.dims for a in self.actors], dtype=float).reshape(-1, 2)
+
+    @cached_property
+    def _aabb(self) -> np.ndarray:
+        """(n, 4) axis-aligned boxes as (x_min, x_max, y_min, y_max) columns."""
+        return _bounds(self._pos, self._dims / 2)
+
     @property
-    def vehicles(self) -> list[Actor]:
+    def vehicles(self) -> tuple[Actor, ...]:
         """Filter actors to vehicles only."""
-        return [a for a in self.actors if a.actor_type == ActorType.VEHICLE]
+        return self._vehicles
 
     @property
-    def pedestrians(self) -> list[Actor]:
+    def pedestrians(self) -> tuple[Actor, ...]:
         """Filter actors to pedestrians only."""
-        return [a for a in self.actors if a.actor_type == ActorType.PEDESTRIAN]
+        return self._pedestrians
 
     @property
     def ego(self) -> Actor:
         """Get the ego vehicle, which is guaranteed to exist"""
-        ego_actors = [a for a in self.actors if a.actor_type == ActorType.EGO]
-        return ego_actors[0]
+        return self.actors[self._ego_index]
+
+    def classify(self) -> ActorClasses:
+        """All three type bins at once, from the single partitioning pass done at construction."""
+        return ActorClasses(ego=self.actors[self._ego_index], vehicles=self._vehicles, pedestrians=self._pedestrians)
+
+    def step(self, dt: float) -> WorldState:
+        """Return the state dt seconds later with every actor, ego included, at constant velocity.
+
+        All positions advance in one vectorized multiply-add over the cached arrays; Actors are
+        only rebuilt to fill the new state's actors tuple.
+
+        Raises:
+            ValueError: If dt <= 0
+        """
+        if dt <= 0:
+            raise ValueError(f"Time step dt must be positive, got {dt}")
+
+        new_pos = self._pos.copy()
+        integrate(new_pos, self._vel, dt)
+        actors = tuple(a._at(x, y) for a, (x, y) in zip(self.actors, new_pos.tolist()))
+        # same actor types/dims and a later time, so the invariants still hold
+        state = WorldState._unchecked(self, self.time + dt, self.ego_turn_start_time, actors)
+        state._seed_caches(pos=new_pos, vel=self._vel, dims=self._dims)
+        return state
+
+    def add_actor(self, actor: Actor) -> WorldState:
+        """Return a new WorldState with actor appended (the cached lookups are rebuilt for it)."""
+        return replace(self, actors=self.actors + (actor,))
+
+    def remove_actor(self, actor: Actor) -> WorldState:
+        """Return a new WorldState without actor (matched by identity).
+
+        Raises:
+            ValueError: If actor is not in this state
+        """
+        for i, a in enumerate(self.actors):
+            if a is actor:
+                return replace(self, actors=self.actors[:i] + self.actors[i + 1:])
+        raise ValueError(f"Actor not in WorldState: {actor}")
+
+
+# eq=False: the generated __eq__ would compare the ndarray fields, whose truth value is ambiguous
+@dataclass(eq=False)
+class RolloutState:
+    """
+    Scratch structure-of-arrays form of a WorldState used while stepping a rollout. Not validated.
+    Row i of every array is actor i of template.actors, which puts the ego first (the order step_world produces).
+    Actors are only materialized on demand, via rollout[i] or to_world_state().
+
+    Kinematics are float64 by default so a rollout matches step_world exactly. Passing
+    dtype=np.float32 to from_world_state halves the buffers for large batches at a cost in precision.
+    Positions within ±1 km keep about 6e-5 m resolution (24-bit mantissa), well below any actor dimension.
+    Integrated positions drift by roughly that much per step relative to float64.
+    """
+    # (n, 2) positions and velocities, both of the same float dtype
+    pos_arr: np.ndarray
+    vel_arr: np.ndarray
+    time: float
+    ego_turn_start_time: float | None
+    # validated WorldState fixing actor order, types and dims for the whole rollout
+    template: WorldState
+
+    @cached_property
+    def actor_type(self) -> np.ndarray:
+        """(n,) ActorType values as uint8."""
+        return np.array([a.actor_type for a in self.template.actors], dtype=np.uint8)
+
+    @property
+    def dims_arr(self) -> np.ndarray:
+        """(n, 2) actor box dimensions."""
+        return self.template._dims
+
+    @property
+    def ego_index(self) -> int:
+        """Row of the ego, always 0."""
+        return 0
+
+    @cached_property
+    def vehicle_indices(self) -> np.ndarray:
+        """Rows holding vehicles."""
+        return np.flatnonzero(self.actor_type == ActorType.VEHICLE)
+
+    @cached_property
+    def pedestrian_indices(self) -> np.ndarray:
+        """Rows holding pedestrians."""
+        return np.flatnonzero(self.actor_type == ActorType.PEDESTRIAN)
+
+    def __len__(self) -> int:
+        return len(self.pos_arr)
+
+    def __getitem__(self, i: int) -> Actor:
+        """Actor view of row i."""
+        (x, y), (vx, vy) = self.pos_arr[i].tolist(), self.vel_arr[i].tolist()
+        actor = self.template.actors[i]
+        return Actor(position=Vector(x=x, y=y), velocity=Vector(x=vx, y=vy), dims=actor.dims, actor_type=actor.actor_type)
+
+    def step(self, dt: float) -> None:
+        """Advance every actor (ego included) dt seconds at constant velocity, in place."""
+        integrate(self.pos_arr, self.vel_arr, dt)
+        self.time += dt
+
+    def stepped(self, dt: float) -> RolloutState:
+        """
+        Functional step(): a new RolloutState dt seconds later with its own position buffer.
+        The velocity buffer and template are shared by reference and no Actors are built.
+        """
+        pos_arr = self.pos_arr.copy()
+        integrate(pos_arr, self.vel_arr, dt)
+        return RolloutState(
+            pos_arr=pos_arr,
+            vel_arr=self.vel_arr,
+            time=self.time + dt,
+            ego_turn_start_time=self.ego_turn_start_time,
+            template=self.template
+        )
+
+    @classmethod
+    def from_world_state(cls, state: WorldState, dtype: np.dtype = np.float64) -> RolloutState:
+        """Convert once at the start of a rollout, moving the ego to row 0. dtype sets the kinematics precision."""
+        ego_idx = state._ego_index
+        order = [ego_idx] + [i for i in range(len(state.actors)) if i != ego_idx]
+        template = WorldState(
+            time=state.time,
+            ego_turn_start_time=state.ego_turn_start_time,
+            actors=tuple(state.actors[i] for i in order),
+            geometry=state.geometry
+        )
+        return cls(
+            pos_arr=state._pos[order].astype(dtype, copy=False),
+            vel_arr=state._vel[order].astype(dtype, copy=False),
+            time=state.time,
+            ego_turn_start_time=state.ego_turn_start_time,
+            template=template
+        )
+
+    def to_world_state(self) -> WorldState:
+        """
+        Snapshot as a WorldState, skipping validation (the template was already validated).
+        Every row is read from pos_arr/vel_arr, like rollout[i]; rows whose velocity still matches the
+        template (all but the ego in a normal rollout) reuse the template's velocity Vector and heading.
+        """
+        template = self.template.actors
+        changed = (self.vel_arr != self.template._vel).any(axis=1).tolist()
+        actors = [
+            Actor(position=Vector(x=x, y=y), velocity=Vector(x=vx, y=vy), dims=actor.dims, actor_type=actor.actor_type)
+            if moved else actor._at(x, y)
+            for actor, moved, (x, y), (vx, vy) in zip(template, changed, self.pos_arr.tolist(), self.vel_arr.tolist())
+        ]
+        state = WorldState._unchecked(self.template, self.time, self.ego_turn_start_time, tuple(actors))
+        # seed the array caches so collision checks on the snapshot don't rebuild them; _pos is a copy
+        # because step() keeps integrating pos_arr in place after the snapshot is taken
+        state._seed_caches(pos=np.array(self.pos_arr, dtype=np.float64), dims=self.template._dims)
+        return state
+
 
 __all__ = [
     "Action",
     "ActorType",
     "Actor",
-    "WorldState"
+    "ActorClasses",
+    "WorldState",
+    "RolloutState"
 ]
\ No newline at end of file